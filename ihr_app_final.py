@@ -1,31 +1,68 @@
+import io
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
 # Page config
 st.set_page_config(page_title="Industrial HR Dashboard", layout="wide")
 st.title("🏭 Industrial HR Analytics Dashboard")
 
+REQUIRED_COLS = [
+    'NIC_Name', 'Main_Workers_Total_Persons', 'Marginal_Workers_Total_Persons',
+    'Main_Workers_Total_Females', 'Marginal_Workers_Total_Females',
+    'Main_Workers_Urban_Persons', 'Marginal_Workers_Urban_Persons',
+    'Main_Workers_Rural_Persons', 'Marginal_Workers_Rural_Persons',
+    'Main_Workers_Total_Males', 'Marginal_Workers_Total_Males'
+]
+REQUIRED_COLS_SET = set(REQUIRED_COLS)
+
+def read_csv_projected(uploaded_file, **kwargs):
+    """Parse only the needed columns, preferring the multi-threaded PyArrow engine."""
+    try:
+        return pd.read_csv(uploaded_file, engine='pyarrow', usecols=REQUIRED_COLS, **kwargs)
+    except Exception:
+        # PyArrow missing, untrimmed headers, or malformed file: retry with the
+        # default engine, which accepts a callable for header cleanup
+        uploaded_file.seek(0)
+        return pd.read_csv(uploaded_file, usecols=lambda c: c.strip() in REQUIRED_COLS_SET, **kwargs)
+
 # Load and process data
-# Load and process data
+@st.cache_data(persist="disk", max_entries=8)
+def load_and_process(file_bytes):
+    """Parse and process an upload, cached on the raw bytes.
+
+    Hashing the bytes is one fast pass over the buffer, so reruns (and
+    re-uploads of the same file) skip both read_csv and process_data.
+    """
+    buf = io.BytesIO(file_bytes)
+    # Try default comma delimiter first
+    try:
+        df = read_csv_projected(buf)
+    except Exception:
+        # Fallback to tab delimiter if comma fails
+        buf.seek(0)
+        df = read_csv_projected(buf, delimiter='\t')
+
+    df.columns = df.columns.str.strip()  # Clean column names
+    return process_data(df)
+
 def load_data():
     st.sidebar.header("📁 Upload CSV File")
     uploaded_file = st.sidebar.file_uploader("Upload CSV", type=['csv'])
 
     if uploaded_file:
         try:
-            # Try default comma delimiter first
-            try:
-                df = pd.read_csv(uploaded_file)
-            except:
-                # Fallback to tab delimiter if comma fails
-                df = pd.read_csv(uploaded_file, delimiter='\t')
-
-            df.columns = df.columns.str.strip()  # Clean column names
+            df = load_and_process(uploaded_file.getvalue())
             st.sidebar.success(f"✅ Loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-            return process_data(df)
+            return df
         except Exception as e:
             st.sidebar.error(f"❌ Error loading file: {e}")
             return pd.DataFrame()
@@ -33,97 +70,235 @@ def load_data():
     st.sidebar.info("📤 Upload a CSV file to begin analysis")
     return pd.DataFrame()
 
-@st.cache_data
 def process_data(df):
-    required_cols = [
-        'NIC_Name', 'Main_Workers_Total_Persons', 'Marginal_Workers_Total_Persons',
-        'Main_Workers_Total_Females', 'Marginal_Workers_Total_Females',
-        'Main_Workers_Urban_Persons', 'Marginal_Workers_Urban_Persons',
-        'Main_Workers_Rural_Persons', 'Marginal_Workers_Rural_Persons',
-        'Main_Workers_Total_Males', 'Marginal_Workers_Total_Males'
-    ]
+    required_cols = REQUIRED_COLS
     missing = [col for col in required_cols if col not in df.columns]
     if missing:
         st.error(f"Missing columns: {', '.join(missing)}")
         return pd.DataFrame()
 
-    for col in required_cols[1:]:
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-    df['Total Workers'] = df['Main_Workers_Total_Persons'] + df['Marginal_Workers_Total_Persons']
-    df['Female Ratio'] = (df['Main_Workers_Total_Females'] + df['Marginal_Workers_Total_Females']) / df['Total Workers']
-    df['Urban Ratio'] = (df['Main_Workers_Urban_Persons'] + df['Marginal_Workers_Urban_Persons']) / df['Total Workers']
-    df['Female Ratio'] = df['Female Ratio'].replace([np.inf, -np.inf], 0).fillna(0)
-    df['Urban Ratio'] = df['Urban Ratio'].replace([np.inf, -np.inf], 0).fillna(0)
-
-    def classify_industry(name):
-        if not isinstance(name, str): return 'Other'
-        name = name.lower()
-        if any(x in name for x in ['crop', 'animal', 'farm', 'agriculture']): return 'Agriculture'
-        if any(x in name for x in ['manufactur', 'factory', 'production']): return 'Manufacturing'
-        if any(x in name for x in ['retail', 'trade', 'shop']): return 'Retail & Trade'
-        if any(x in name for x in ['poultry', 'cattle', 'livestock']): return 'Poultry & Livestock'
-        if any(x in name for x in ['mining', 'quarry', 'coal']): return 'Mining'
-        return 'Other'
-
-    df['Industry Category'] = df['NIC_Name'].apply(classify_industry)
+    # read_csv usually parses these as numeric already; only coerce the
+    # columns that actually came back as strings
+    non_numeric = [c for c in required_cols[1:] if not np.issubdtype(df[c].dtype, np.number)]
+    if non_numeric:
+        df[non_numeric] = df[non_numeric].apply(pd.to_numeric, errors='coerce')
+    df[required_cols[1:]] = df[required_cols[1:]].fillna(0)
+
+    # Worker counts fit comfortably in int32; halving the bytes halves the
+    # bandwidth every later sum/groupby has to move
+    df[required_cols[1:]] = df[required_cols[1:]].astype(np.int32)
+
+    # Compute totals and ratios in one pass over a contiguous block;
+    # the where= guard avoids the inf/NaN cleanup passes entirely
+    arr = df[required_cols[1:]].to_numpy(copy=False)
+    total = arr[:, 0] + arr[:, 1]
+    female = (arr[:, 2] + arr[:, 3]).astype(np.float32)
+    urban = (arr[:, 4] + arr[:, 5]).astype(np.float32)
+    totalf = total.astype(np.float32)
+    if numexpr is not None and len(df) >= 10_000:
+        # NumExpr fuses the guard and division into one threaded pass;
+        # only worth the dispatch overhead on larger frames
+        local = {'t': totalf, 'f': female, 'u': urban}
+        female_ratio = numexpr.evaluate("where(t > 0, f / t, 0)", local_dict=local)
+        urban_ratio = numexpr.evaluate("where(t > 0, u / t, 0)", local_dict=local)
+    else:
+        female_ratio = np.zeros_like(totalf)
+        urban_ratio = np.zeros_like(totalf)
+        np.divide(female, totalf, out=female_ratio, where=total > 0)
+        np.divide(urban, totalf, out=urban_ratio, where=total > 0)
+    df = df.assign(**{'Total Workers': total, 'Female Ratio': female_ratio, 'Urban Ratio': urban_ratio})
+
+    # Vectorized classification: one regex mask per category, first match wins
+    name = df['NIC_Name'].fillna('').astype(str).str.lower()
+    masks = [
+        name.str.contains(r'crop|animal|farm|agriculture', regex=True, na=False),
+        name.str.contains(r'manufactur|factory|production', regex=True, na=False),
+        name.str.contains(r'retail|trade|shop', regex=True, na=False),
+        name.str.contains(r'poultry|cattle|livestock', regex=True, na=False),
+        name.str.contains(r'mining|quarry|coal', regex=True, na=False),
+    ]
+    categories = ['Agriculture', 'Manufacturing', 'Retail & Trade', 'Poultry & Livestock', 'Mining']
+    df['Industry Category'] = np.select(masks, categories, default='Other')
+
+    # Both grouping keys are low-cardinality strings; category dtype makes
+    # every downstream groupby integer-code based and shrinks the columns
+    df['Industry Category'] = df['Industry Category'].astype('category')
+    df['NIC_Name'] = df['NIC_Name'].astype('category')
     return df
 
-def generate_insights(df):
+def top_k(frame, col, k):
+    """O(n) top-k rows by `col` via np.argpartition; sorts only the k winners."""
+    vals = frame[col].to_numpy()
+    if len(vals) <= k:
+        return frame.sort_values(col, ascending=False)
+    idx = np.argpartition(-vals, k)[:k]
+    return frame.iloc[idx].sort_values(col, ascending=False)
+
+@st.cache_data
+def industry_agg(df):
+    """One shared Industry Category aggregate for insights and every chart."""
+    return df.groupby('Industry Category', observed=True, sort=False).agg({
+        'Total Workers': 'sum', 'Female Ratio': 'mean', 'Urban Ratio': 'mean',
+        'Main_Workers_Total_Males': 'sum', 'Main_Workers_Total_Females': 'sum'
+    })
+
+@st.cache_data
+def nic_agg(df):
+    return df.groupby('NIC_Name', observed=True, sort=False).agg({
+        'Total Workers': 'sum', 'Female Ratio': 'mean', 'Urban Ratio': 'mean'
+    })
+
+@st.cache_data
+def head_preview(df):
+    """Stable first-100-rows slice so the raw-data viewer reuses one object."""
+    return df.head(100)
+
+@st.cache_data
+def totals(df):
+    """Scalar workforce totals, summed once and shared by every consumer."""
+    s = df[REQUIRED_COLS[1:]].sum()
+    return {
+        'male': int(s['Main_Workers_Total_Males'] + s['Marginal_Workers_Total_Males']),
+        'female': int(s['Main_Workers_Total_Females'] + s['Marginal_Workers_Total_Females']),
+        'urban': int(s['Main_Workers_Urban_Persons'] + s['Marginal_Workers_Urban_Persons']),
+        'rural': int(s['Main_Workers_Rural_Persons'] + s['Marginal_Workers_Rural_Persons']),
+        'marginal': int(s['Marginal_Workers_Total_Persons']),
+        'total': int(s['Main_Workers_Total_Persons'] + s['Marginal_Workers_Total_Persons']),
+        'n_industries': df['NIC_Name'].nunique(),
+        'n_categories': df['Industry Category'].nunique(),
+    }
+
+@st.cache_data
+def growth_table(agg):
+    """Per-category Growth Score, sorted once and shared by insights and charts."""
+    stats = agg[['Total Workers', 'Female Ratio', 'Urban Ratio']].copy()
+    stats['Growth Score'] = stats['Urban Ratio'] * 0.4 + stats['Female Ratio'] * 0.6
+    return stats.sort_values('Growth Score', ascending=False)
+
+@st.cache_data
+def generate_insights(agg, tot, growth):
     insights = {}
-    industry_share = df.groupby('Industry Category')['Total Workers'].sum()
+    industry_share = agg['Total Workers']
     total = industry_share.sum()
     insights['top_industry'] = industry_share.idxmax()
     insights['top_share'] = (industry_share.max() / total * 100)
 
-    female_total = (df['Main_Workers_Total_Females'] + df['Marginal_Workers_Total_Females']).sum()
-    insights['female_percent'] = (female_total / df['Total Workers'].sum() * 100)
+    insights['female_percent'] = (tot['female'] / tot['total'] * 100)
+    insights['marginal_percent'] = (tot['marginal'] / tot['total'] * 100)
 
-    marginal_total = df['Marginal_Workers_Total_Persons'].sum()
-    insights['marginal_percent'] = (marginal_total / df['Total Workers'].sum() * 100)
-
-    industry_stats = df.groupby('Industry Category').agg({
-        'Total Workers': 'sum', 'Female Ratio': 'mean', 'Urban Ratio': 'mean'
-    })
-    industry_stats['Growth Score'] = (industry_stats['Urban Ratio'] * 0.4 + industry_stats['Female Ratio'] * 0.6)
-    insights['growth_industry'] = industry_stats['Growth Score'].idxmax()
+    insights['growth_industry'] = growth.index[0]
 
     return insights
 
-# Visualization functions
-def plot_industry_distribution(df):
-    industry_totals = df.groupby('Industry Category')['Total Workers'].sum().sort_values(ascending=False)
-    fig = px.bar(industry_totals.head(10), orientation='h',
-                 title="Top 10 Industries by Total Workers",
-                 labels={'value': 'Total Workers', 'index': 'Industry'})
-    st.plotly_chart(fig, use_container_width=True)
-
-def plot_gender_analysis(df):
-    male_total = (df['Main_Workers_Total_Males'] + df['Marginal_Workers_Total_Males']).sum()
-    female_total = (df['Main_Workers_Total_Females'] + df['Marginal_Workers_Total_Females']).sum()
-    fig = px.pie(values=[male_total, female_total], names=['Male', 'Female'],
-                 title="Overall Gender Composition")
-    st.plotly_chart(fig, use_container_width=True)
-
-def plot_urban_rural(df):
-    rural = (df['Main_Workers_Rural_Persons'] + df['Marginal_Workers_Rural_Persons']).sum()
-    urban = (df['Main_Workers_Urban_Persons'] + df['Marginal_Workers_Urban_Persons']).sum()
-    fig = px.pie(values=[rural, urban], names=['Rural', 'Urban'],
-                 title="Rural vs Urban Workforce")
-    st.plotly_chart(fig, use_container_width=True)
-
-def plot_growth_potential(df):
-    industry_stats = df.groupby('Industry Category').agg({
-        'Total Workers': 'sum', 'Female Ratio': 'mean', 'Urban Ratio': 'mean'
-    })
-    industry_stats['Growth Score'] = (industry_stats['Urban Ratio'] * 0.4 + industry_stats['Female Ratio'] * 0.6)
-    top_growth = industry_stats.nlargest(8, 'Growth Score')
+# Visualization functions: figure builders are cached (their inputs are the
+# small cached aggregates, so hashing is cheap and hits are frequent) and the
+# plot_* wrappers just hand the cached figure to Streamlit
+@st.cache_data
+def build_industry_distribution_fig(agg):
+    industry_totals = top_k(agg, 'Total Workers', 10)['Total Workers']
+    return px.bar(industry_totals, orientation='h',
+                  title="Top 10 Industries by Total Workers",
+                  labels={'value': 'Total Workers', 'index': 'Industry'})
+
+@st.cache_data
+def build_gender_analysis_fig(tot):
+    return px.pie(values=[tot['male'], tot['female']], names=['Male', 'Female'],
+                  title="Overall Gender Composition")
 
+@st.cache_data
+def build_urban_rural_fig(tot):
+    return px.pie(values=[tot['rural'], tot['urban']], names=['Rural', 'Urban'],
+                  title="Rural vs Urban Workforce")
+
+@st.cache_data
+def build_growth_potential_fig(growth):
+    top_growth = growth.head(8)
     fig = go.Figure()
     fig.add_trace(go.Bar(name='Urban Ratio', x=top_growth.index, y=top_growth['Urban Ratio']))
     fig.add_trace(go.Bar(name='Female Ratio', x=top_growth.index, y=top_growth['Female Ratio']))
     fig.update_layout(title="Top Industries by Growth Potential", barmode='group')
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+@st.cache_data
+def build_gender_by_industry_fig(agg):
+    industry_comparison = top_k(agg[[
+        'Total Workers', 'Main_Workers_Total_Males', 'Main_Workers_Total_Females'
+    ]], 'Total Workers', 10)
+    return px.bar(industry_comparison,
+                  y=industry_comparison.index,
+                  x=['Main_Workers_Total_Males', 'Main_Workers_Total_Females'],
+                  orientation='h',
+                  title="Gender Distribution by Industry",
+                  barmode='stack',
+                  labels={'value': 'Workers', 'variable': 'Gender'})
+
+@st.cache_data
+def build_urban_female_scatter_fig(agg):
+    scatter_data = agg[['Urban Ratio', 'Female Ratio', 'Total Workers']]
+    return px.scatter(scatter_data, x='Urban Ratio', y='Female Ratio',
+                      size='Total Workers', color=scatter_data.index,
+                      title="Urbanization vs Gender Diversity",
+                      hover_name=scatter_data.index)
+
+def plot_industry_distribution(agg):
+    st.plotly_chart(build_industry_distribution_fig(agg), use_container_width=True)
+
+def plot_gender_analysis(tot):
+    st.plotly_chart(build_gender_analysis_fig(tot), use_container_width=True)
+
+def plot_urban_rural(tot):
+    st.plotly_chart(build_urban_rural_fig(tot), use_container_width=True)
+
+def plot_growth_potential(growth):
+    st.plotly_chart(build_growth_potential_fig(growth), use_container_width=True)
+
+# Tab renderers: fragments so a widget interaction inside one tab only
+# reruns that tab, not the whole page
+@st.fragment
+def render_tab1(agg, tot, growth):
+    st.subheader("Workforce Overview")
+    col1, col2 = st.columns(2)
+    with col1: plot_industry_distribution(agg)
+    with col2: plot_gender_analysis(tot)
+    col3, col4 = st.columns(2)
+    with col3: plot_urban_rural(tot)
+    with col4: plot_growth_potential(growth)
+
+@st.fragment
+def render_tab2(df):
+    st.subheader("Industry Analysis")
+    top_industries = top_k(nic_agg(df), 'Total Workers', 15)
+    st.dataframe(top_industries, column_config={
+        'Total Workers': st.column_config.NumberColumn(format='%d'),
+        'Female Ratio': st.column_config.NumberColumn(format='percent'),
+        'Urban Ratio': st.column_config.NumberColumn(format='percent')
+    })
+
+@st.fragment
+def render_tab3(insights):
+    st.subheader("Strategic Insights")
+
+    st.info(f"🏆 Dominant Sector: **{insights['top_industry']}** employs **{insights['top_share']:.1f}%** of the total workforce")
+
+    st.warning(f"⚠️ Workforce Vulnerability: **{insights['marginal_percent']:.1f}%** are marginal workers needing social security")
+
+    st.success(f"🚀 Growth Opportunity: **{insights['growth_industry']}** shows highest growth potential based on urbanization and gender inclusion")
+
+    st.error(f"👥 Gender Gap: Only **{insights['female_percent']:.1f}%** female participation — opportunity to improve gender equity")
+
+    st.subheader("🎯 Recommendations")
+    st.markdown(f"""
+    1. **Invest in `{insights['growth_industry']}`** – High potential for inclusive job creation
+    2. **Formalize `{insights['top_industry']}`** – Largest employer needs stability and regulation
+    3. **Gender Programs** – Bridge the **{100 - insights['female_percent']:.1f}%** gender gap through targeted skilling and inclusion
+    4. **Social Security Measures** – Protect **{insights['marginal_percent']:.1f}%** marginal workers with benefits and formal contracts
+    """)
+
+@st.fragment
+def render_tab4(agg):
+    st.subheader("Interactive Charts")
+    st.plotly_chart(build_gender_by_industry_fig(agg), use_container_width=True)
+    st.plotly_chart(build_urban_female_scatter_fig(agg), use_container_width=True)
 
 # Main app
 def main():
@@ -132,15 +307,18 @@ def main():
         st.info("📤 Upload your industrial workforce Excel file to begin analysis.")
         return
 
-    st.sidebar.subheader("📊 Summary")
-    st.sidebar.metric("Total Workforce", f"{df['Total Workers'].sum():,}")
-    st.sidebar.metric("Industries", df['NIC_Name'].nunique())
-    st.sidebar.metric("Categories", df['Industry Category'].nunique())
+    agg = industry_agg(df)
+    tot = totals(df)
+    growth = growth_table(agg)
+    insights = generate_insights(agg, tot, growth)
 
-    insights = generate_insights(df)
+    st.sidebar.subheader("📊 Summary")
+    st.sidebar.metric("Total Workforce", f"{tot['total']:,}")
+    st.sidebar.metric("Industries", tot['n_industries'])
+    st.sidebar.metric("Categories", tot['n_categories'])
 
     col1, col2, col3, col4 = st.columns(4)
-    with col1: st.metric("Total Workers", f"{df['Total Workers'].sum():,}")
+    with col1: st.metric("Total Workers", f"{tot['total']:,}")
     with col2: st.metric("Female Workforce", f"{insights['female_percent']:.1f}%")
     with col3: st.metric("Marginal Workers", f"{insights['marginal_percent']:.1f}%")
     with col4: st.metric("Top Industry", insights['top_industry'])
@@ -148,81 +326,22 @@ def main():
     tab1, tab2, tab3, tab4 = st.tabs(["📈 Overview", "🏭 Industries", "🔍 Insights", "📊 Charts"])
 
     with tab1:
-        st.subheader("Workforce Overview")
-        col1, col2 = st.columns(2)
-        with col1: plot_industry_distribution(df)
-        with col2: plot_gender_analysis(df)
-        col3, col4 = st.columns(2)
-        with col3: plot_urban_rural(df)
-        with col4: plot_growth_potential(df)
+        render_tab1(agg, tot, growth)
 
     with tab2:
-        st.subheader("Industry Analysis")
-        top_industries = df.groupby('NIC_Name').agg({
-            'Total Workers': 'sum',
-            'Female Ratio': 'mean',
-            'Urban Ratio': 'mean'
-        }).nlargest(15, 'Total Workers')
-        st.dataframe(top_industries.style.format({
-            'Total Workers': '{:,}',
-            'Female Ratio': '{:.2%}',
-            'Urban Ratio': '{:.2%}'
-        }))
+        render_tab2(df)
 
     with tab3:
-        st.subheader("Strategic Insights")
-
-        st.info(f"🏆 Dominant Sector: **{insights['top_industry']}** employs **{insights['top_share']:.1f}%** of the total workforce")
-
-        st.warning(f"⚠️ Workforce Vulnerability: **{insights['marginal_percent']:.1f}%** are marginal workers needing social security")
-
-        st.success(f"🚀 Growth Opportunity: **{insights['growth_industry']}** shows highest growth potential based on urbanization and gender inclusion")
-
-        st.error(f"👥 Gender Gap: Only **{insights['female_percent']:.1f}%** female participation — opportunity to improve gender equity")
-
-        st.subheader("🎯 Recommendations")
-        st.markdown(f"""
-        1. **Invest in `{insights['growth_industry']}`** – High potential for inclusive job creation  
-        2. **Formalize `{insights['top_industry']}`** – Largest employer needs stability and regulation  
-        3. **Gender Programs** – Bridge the **{100 - insights['female_percent']:.1f}%** gender gap through targeted skilling and inclusion  
-        4. **Social Security Measures** – Protect **{insights['marginal_percent']:.1f}%** marginal workers with benefits and formal contracts  
-        """)
+        render_tab3(insights)
 
     with tab4:
-        st.subheader("Interactive Charts")
-
-        # Gender distribution by industry
-        industry_comparison = df.groupby('Industry Category').agg({
-            'Total Workers': 'sum',
-            'Main_Workers_Total_Males': 'sum',
-            'Main_Workers_Total_Females': 'sum'
-        }).nlargest(10, 'Total Workers')
-
-        fig = px.bar(industry_comparison,
-                     y=industry_comparison.index,
-                     x=['Main_Workers_Total_Males', 'Main_Workers_Total_Females'],
-                     orientation='h',
-                     title="Gender Distribution by Industry",
-                     barmode='stack',
-                     labels={'value': 'Workers', 'variable': 'Gender'})
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Scatter plot: Urbanization vs Female Ratio
-        scatter_data = df.groupby('Industry Category').agg({
-            'Urban Ratio': 'mean',
-            'Female Ratio': 'mean',
-            'Total Workers': 'sum'
-        })
-
-        fig = px.scatter(scatter_data, x='Urban Ratio', y='Female Ratio',
-                         size='Total Workers', color=scatter_data.index,
-                         title="Urbanization vs Gender Diversity",
-                         hover_name=scatter_data.index)
-        st.plotly_chart(fig, use_container_width=True)
-
-    # Raw data viewer
+        render_tab4(agg)
+
+    # Raw data viewer: the table is only built once the toggle is on, and the
+    # 100-row slice itself comes from the cache
     with st.expander("📋 View Raw Data"):
-        st.dataframe(df.head(100))
+        if st.toggle("Show first 100 rows", key='raw_open'):
+            st.dataframe(head_preview(df))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file